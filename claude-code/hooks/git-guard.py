@@ -9,21 +9,32 @@ Reads hook JSON from stdin. Returns systemMessage for git init,
 writes sidecar files for git commit, exits 0 for everything else.
 """
 
-import fcntl
-import hashlib
 import json
 import os
+import re
 import stat
-import subprocess
 import sys
-from datetime import datetime, timezone
+import time
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # hooks run on the system python3; orjson is optional
+    orjson = None
+
+# Hooks may run under python3 -I, which drops the script dir from sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from task_cache import load_tasks
+
 COMMIT_CONTEXT_DIR = Path.home() / ".claude" / "commit-context"
-TASKS_DIR = Path.home() / ".claude" / "tasks"
 POST_REWRITE_MARKER = "# managed-by: post-commit-context"
 POST_REWRITE_SCRIPT = Path.home() / ".claude" / "hooks" / "post-rewrite-context.py"
 
+# Word-bounded so path-ish strings like "legit commit" don't trigger capture
+GIT_COMMIT_RE = re.compile(r"\bgit\s+commit\b")
+
+HEAD_REF_RE = re.compile(r"^ref: (\S+)$")
+
 
 def handle_git_init(event):
     """Detect `git init` and suggest Mesa setup."""
@@ -47,52 +58,152 @@ def handle_git_init(event):
     }))
 
 
-def handle_git_commit():
-    """Capture task context as sidecar JSON on git commit."""
+def utc_timestamp():
+    """UTC ISO-8601 timestamp via gmtime, skipping datetime's tzinfo machinery."""
+    ts = time.time()
+    t = time.gmtime(ts)
+    return "%04d-%02d-%02dT%02d:%02d:%02d.%03dZ" % (
+        t.tm_year, t.tm_mon, t.tm_mday,
+        t.tm_hour, t.tm_min, t.tm_sec, int(ts % 1 * 1000),
+    )
+
+
+def serialize_sidecar(obj):
+    """Encode a sidecar dict to compact JSON bytes with a trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode()
+
+
+def find_git_root(start):
+    """Walk up from start to the nearest directory containing .git, or None."""
+    path = os.path.abspath(start)
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def read_head_sha(git_dir):
+    """Resolve HEAD to a commit SHA by reading git's files directly.
+
+    Raises OSError if HEAD or its ref cannot be read/resolved.
+    """
+    with open(os.path.join(git_dir, "HEAD")) as f:
+        head = f.read().strip()
+
+    m = HEAD_REF_RE.match(head)
+    if not m:
+        return head  # detached HEAD is already a SHA
+
+    ref = m.group(1)
+    ref_file = os.path.join(git_dir, ref)
+    if os.path.isfile(ref_file):
+        with open(ref_file) as f:
+            return f.read().strip()
+
+    # Ref may only exist in packed-refs after gc
+    with open(os.path.join(git_dir, "packed-refs")) as f:
+        for line in f.read().splitlines():
+            if line.endswith(" " + ref):
+                return line.split(" ", 1)[0]
+
+    raise OSError(f"unresolvable ref: {ref}")
+
+
+def resolve_repo_state():
+    """Return (sha, toplevel, git_dir) without spawning git where possible.
+
+    Reads .git/HEAD (and refs/packed-refs) directly for ordinary repos.
+    Worktrees and submodules, where .git is a `gitdir: ...` pointer file,
+    fall back to git itself. Returns (None, None, None) outside a repo.
+    """
+    root = find_git_root(os.getcwd())
+    if root is not None:
+        dot_git = os.path.join(root, ".git")
+        if os.path.isdir(dot_git):
+            try:
+                return read_head_sha(dot_git), root, dot_git
+            except OSError:
+                pass
+
+    import subprocess  # deferred: only the worktree/submodule fallback forks
+
     try:
         sha = subprocess.check_output(
-            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL, close_fds=False
         ).strip()
-    except subprocess.CalledProcessError:
-        return
-
-    try:
         toplevel = subprocess.check_output(
-            ["git", "rev-parse", "--show-toplevel"], text=True, stderr=subprocess.DEVNULL
+            ["git", "rev-parse", "--show-toplevel"], text=True, stderr=subprocess.DEVNULL, close_fds=False
         ).strip()
-    except subprocess.CalledProcessError:
-        return
+        git_dir = subprocess.check_output(
+            ["git", "rev-parse", "--git-dir"], text=True, stderr=subprocess.DEVNULL, close_fds=False
+        ).strip()
+        return sha, toplevel, git_dir
+    except (subprocess.CalledProcessError, OSError):
+        return None, None, None
+
+
+def get_project_id(toplevel, git_dir):
+    """Return the 12-char project id, memoized at <git_dir>/claude-project-id."""
+    cache_file = os.path.join(git_dir, "claude-project-id")
+    try:
+        with open(cache_file) as f:
+            cached = f.read().strip()
+        if len(cached) == 12:
+            return cached
+    except OSError:
+        pass
+
+    import hashlib  # deferred: only needed on a cache miss
 
     project_id = hashlib.sha256(toplevel.encode()).hexdigest()[:12]
+    try:
+        with open(cache_file, "w") as f:
+            f.write(project_id + "\n")
+    except OSError:
+        pass
+    return project_id
+
 
+def handle_git_commit():
+    """Capture task context as sidecar JSON on git commit."""
+    # Get the commit SHA, project root, and git dir without spawning git
+    sha, toplevel, git_dir = resolve_repo_state()
+    if sha is None:
+        return
+
+    project_id = get_project_id(toplevel, git_dir)
+
+    # Collect task data from all active teams, via the shared mtime cache
     task_references = []
     task_dumps = []
-    if TASKS_DIR.is_dir():
-        for team_dir in TASKS_DIR.iterdir():
-            if not team_dir.is_dir():
-                continue
-            team_name = team_dir.name
-            for task_file in team_dir.glob("*.json"):
-                try:
-                    data = json.loads(task_file.read_text())
-                    task_id = task_file.stem
-                    task_references.append({"task_id": task_id, "team_name": team_name})
-                    task_dumps.append({
-                        "task_id": task_id,
-                        "team_name": team_name,
-                        "data": {
-                            "subject": data.get("subject", ""),
-                            "description": data.get("description", ""),
-                            "status": data.get("status", ""),
-                            "owner": data.get("owner", ""),
-                        },
-                    })
-                except (json.JSONDecodeError, OSError):
-                    continue
+    for team_name, file_name, data in load_tasks():
+        task_id = file_name[:-5]
+        task_references.append({"task_id": task_id, "team_name": team_name})
+        # Empty fields carry no information — drop them to keep large
+        # sidecars small on disk.
+        task_dumps.append({
+            "task_id": task_id,
+            "team_name": team_name,
+            "data": {
+                k: v
+                for k, v in (
+                    ("subject", data.get("subject", "")),
+                    ("description", data.get("description", "")),
+                    ("status", data.get("status", "")),
+                    ("owner", data.get("owner", "")),
+                )
+                if v
+            },
+        })
 
     sidecar = {
         "commit_sha": sha,
-        "timestamp": datetime.now(timezone.utc).astimezone().isoformat(),
+        "timestamp": utc_timestamp(),
         "project_root": toplevel,
         "project_id": project_id,
         "session_id": os.environ.get("CLAUDE_SESSION_ID", ""),
@@ -100,26 +211,33 @@ def handle_git_commit():
         "task_dumps": task_dumps,
     }
 
+    # Write to a pid-suffixed temp file and rename into place: atomic on
+    # POSIX, so concurrent hooks can't interleave writes or drop the sidecar
+    # the way the old flock LOCK_NB path silently did.
     out_dir = COMMIT_CONTEXT_DIR / project_id
     out_dir.mkdir(parents=True, exist_ok=True)
     out_file = out_dir / f"{sha}.json"
+    tmp_file = out_dir / f"{sha}.json.tmp.{os.getpid()}"
 
+    payload = serialize_sidecar(sidecar)
     try:
-        fd = open(out_file, "w")
-        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-        json.dump(sidecar, fd, indent=2)
-        fd.write("\n")
-        fcntl.flock(fd, fcntl.LOCK_UN)
-        fd.close()
-    except (BlockingIOError, OSError):
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        os.replace(tmp_file, out_file)
+    except OSError:
+        try:
+            os.unlink(tmp_file)
+        except OSError:
+            pass
         return
 
+    # Auto-install git post-rewrite hook
     try:
-        git_dir = subprocess.check_output(
-            ["git", "rev-parse", "--git-dir"], text=True, stderr=subprocess.DEVNULL
-        ).strip()
         install_post_rewrite_hook(Path(git_dir))
-    except (subprocess.CalledProcessError, OSError):
+    except OSError:
         pass
 
 
@@ -148,13 +266,13 @@ def main():
     except (json.JSONDecodeError, EOFError):
         sys.exit(0)
 
-    command = event.get("tool_input", {}).get("command", "").strip()
+    command = event.get("tool_input", {}).get("command", "")
     if not command:
         sys.exit(0)
 
-    if command.startswith("git init"):
+    if command.lstrip()[:8] == "git init":
         handle_git_init(event)
-    elif "git commit" in command:
+    elif GIT_COMMIT_RE.search(command):
         handle_git_commit()
 
     sys.exit(0)
@@ -7,56 +7,163 @@ Reads old-sha/new-sha pairs from stdin and copies sidecar context files accordin
 
 import hashlib
 import json
-import shutil
+import os
+import re
 import subprocess
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # hooks run on the system python3; orjson is optional
+    orjson = None
+
 COMMIT_CONTEXT_DIR = Path.home() / ".claude" / "commit-context"
 
 
-def main():
-    # Determine project-id
+def serialize_sidecar(obj):
+    """Encode a sidecar dict to compact JSON bytes with a trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode()
+
+
+COMMIT_SHA_RE = re.compile(rb'"commit_sha":\s*"[0-9a-fA-F]*"')
+
+# "old-sha new-sha [extra]" lines from git's post-rewrite stdin. Matching on
+# bytes extracts both SHAs in one scan without decoding or split allocations.
+REWRITE_PAIR_RE = re.compile(rb"^([0-9a-f]+)\s+([0-9a-f]+)")
+
+
+def splice_key(raw, key, value):
+    """Add one top-level string key to serialized sidecar bytes.
+
+    Splices before the closing brace so the file never has to be parsed.
+    Returns None (caller falls back to the JSON round-trip) if the key is
+    already present or the bytes do not look like a sidecar object.
+    """
+    if f'"{key}"'.encode() in raw:
+        return None
+    idx = raw.rfind(b"}")
+    if idx == -1:
+        return None
+    head = raw[:idx].rstrip()
+    sep = b"" if head.endswith(b"{") else b","
+    return head + sep + f'"{key}":"{value}"'.encode() + b"}\n"
+
+
+def patch_new_sidecar(raw, old_sha, new_sha):
+    """Derive the rewritten commit's sidecar bytes from the old one.
+
+    Rewrites the commit_sha value in place and splices in rewritten_from.
+    Returns None if the bytes cannot be patched safely.
+    """
+    if b'"rewritten_from"' in raw:
+        return None
+    patched, n = COMMIT_SHA_RE.subn(
+        b'"commit_sha": "' + new_sha.encode() + b'"', raw, count=1
+    )
+    if n != 1:
+        return None
+    return splice_key(patched, "rewritten_from", old_sha)
+
+
+def get_project_id():
+    """Resolve the project id, preferring the cache git-guard writes.
+
+    Walks up to the NEAREST .git entry and stops there — a nested worktree's
+    .git pointer file must not be skipped in favor of the main repo above it,
+    or sidecars would be looked up under the wrong project id. A .git
+    directory yields the cached id (or a SHA-256 of that root); a pointer
+    file (worktrees/submodules) falls back to asking git so the worktree's
+    own toplevel is hashed. Returns None outside a repo.
+    """
+    path = os.getcwd()
+    dot_git = None
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.exists(candidate):
+            dot_git = candidate
+            break
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+
+    if dot_git is not None and os.path.isdir(dot_git):
+        try:
+            with open(os.path.join(dot_git, "claude-project-id")) as f:
+                cached = f.read().strip()
+            if len(cached) == 12:
+                return cached
+        except OSError:
+            pass
+        return hashlib.sha256(path.encode()).hexdigest()[:12]
+
     try:
         toplevel = subprocess.check_output(
-            ["git", "rev-parse", "--show-toplevel"], text=True, stderr=subprocess.DEVNULL
+            ["git", "rev-parse", "--show-toplevel"], text=True, stderr=subprocess.DEVNULL, close_fds=False
         ).strip()
     except subprocess.CalledProcessError:
+        return None
+    return hashlib.sha256(toplevel.encode()).hexdigest()[:12]
+
+
+def main():
+    project_id = get_project_id()
+    if project_id is None:
         sys.exit(0)
 
-    project_id = hashlib.sha256(toplevel.encode()).hexdigest()[:12]
     context_dir = COMMIT_CONTEXT_DIR / project_id
 
-    if not context_dir.is_dir():
+    # One readdir batch instead of a stat per rewritten pair — large rebases
+    # hand us hundreds of old/new lines, most without a sidecar.
+    try:
+        with os.scandir(context_dir) as entries:
+            known = {e.name[:-5] for e in entries if e.name.endswith(".json")}
+    except OSError:
         sys.exit(0)
 
     # Git provides old-sha new-sha pairs on stdin, one per line
-    for line in sys.stdin:
-        parts = line.strip().split()
-        if len(parts) < 2:
+    for line in sys.stdin.buffer:
+        m = REWRITE_PAIR_RE.match(line)
+        if not m:
             continue
 
-        old_sha = parts[0]
-        new_sha = parts[1]
+        old_sha = m.group(1).decode()
+        new_sha = m.group(2).decode()
+
+        if old_sha not in known:
+            continue
 
         old_file = context_dir / f"{old_sha}.json"
         new_file = context_dir / f"{new_sha}.json"
 
-        if not old_file.exists():
-            continue
-
         try:
-            old_data = json.loads(old_file.read_text())
+            raw = old_file.read_bytes()
+
+            # Fast path: the only changes are one rewritten value and one
+            # added key per file, so patch the serialized bytes directly
+            # instead of a full JSON parse/re-serialize round-trip.
+            new_raw = patch_new_sidecar(raw, old_sha, new_sha)
+            old_raw = splice_key(raw, "superseded_by", new_sha)
+            if new_raw is not None and old_raw is not None:
+                new_file.write_bytes(new_raw)
+                old_file.write_bytes(old_raw)
+                continue
+
+            # Fallback for sidecars that were already rewritten/superseded
+            old_data = json.loads(raw)
 
             # Create new sidecar file with rewritten_from traceability
             new_data = dict(old_data)
             new_data["commit_sha"] = new_sha
             new_data["rewritten_from"] = old_sha
-            new_file.write_text(json.dumps(new_data, indent=2) + "\n")
+            new_file.write_bytes(serialize_sidecar(new_data))
 
             # Mark the old file as superseded
             old_data["superseded_by"] = new_sha
-            old_file.write_text(json.dumps(old_data, indent=2) + "\n")
+            old_file.write_bytes(serialize_sidecar(old_data))
 
         except (json.JSONDecodeError, OSError):
             continue
@@ -8,13 +8,16 @@ awareness after compaction.
 Learnings are captured automatically at session exit by brain-os-capture.py.
 """
 
-import glob
 import json
 import os
 import subprocess
 import sys
 import time
 
+# Hooks run under python3 -I, which drops the script dir from sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from task_cache import load_tasks
+
 
 CHAIN_FILE = os.path.expanduser("~/.claude/session-learnings-chain.md")
 CHAIN_MAX_AGE_SECONDS = 24 * 60 * 60  # 24 hours
@@ -29,16 +32,51 @@ def run_git(args, cwd=None):
             text=True,
             timeout=5,
             cwd=cwd,
+            close_fds=False,
         )
         return result.stdout.strip() if result.returncode == 0 else ""
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return ""
 
 
+def read_branch(cwd):
+    """Read the current branch from .git/HEAD directly, avoiding a git spawn.
+
+    Returns "" for detached HEAD (matching `git branch --show-current`).
+    The walk stops at the NEAREST .git entry — a nested worktree's .git
+    pointer file must not be skipped in favor of the main repo above it, or
+    the snapshot would report the main repo's branch. Pointer files
+    (worktrees/submodules) fall back to git.
+    """
+    path = os.path.abspath(cwd)
+    dot_git = None
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.exists(candidate):
+            dot_git = candidate
+            break
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+
+    if dot_git is not None and os.path.isdir(dot_git):
+        try:
+            with open(os.path.join(dot_git, "HEAD")) as f:
+                head = f.read().strip()
+        except OSError:
+            return ""
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/"):]
+        return ""
+
+    return run_git(["branch", "--show-current"], cwd=cwd)
+
+
 def get_git_context(cwd):
     """Gather current git state."""
     lines = []
-    branch = run_git(["branch", "--show-current"], cwd=cwd)
+    branch = read_branch(cwd)
     if branch:
         lines.append(f"Current branch: {branch}")
 
@@ -60,24 +98,15 @@ def get_git_context(cwd):
 
 
 def get_task_context():
-    """Gather active tasks from all task lists."""
+    """Gather active tasks from all task lists (via the shared mtime cache)."""
     lines = []
-    tasks_root = os.path.expanduser("~/.claude/tasks")
-    if not os.path.isdir(tasks_root):
-        return lines
-
-    for task_file in glob.glob(os.path.join(tasks_root, "**", "*.json"), recursive=True):
-        try:
-            with open(task_file) as f:
-                task = json.load(f)
-            status = task.get("status", "")
-            if status in ("pending", "in_progress"):
-                subject = task.get("subject", "untitled")
-                owner = task.get("owner", "unassigned")
-                task_id = task.get("id", os.path.basename(task_file))
-                lines.append(f"  [{status}] #{task_id}: {subject} (owner: {owner})")
-        except (json.JSONDecodeError, OSError):
-            continue
+    for _team_name, file_name, task in load_tasks():
+        status = task.get("status", "")
+        if status in ("pending", "in_progress"):
+            subject = task.get("subject", "untitled")
+            owner = task.get("owner", "unassigned")
+            task_id = task.get("id", file_name)
+            lines.append(f"  [{status}] #{task_id}: {subject} (owner: {owner})")
 
     return lines
 
@@ -89,20 +118,23 @@ def get_team_context():
     if not os.path.isdir(teams_root):
         return lines
 
-    for team_dir in glob.glob(os.path.join(teams_root, "*")):
-        config_path = os.path.join(team_dir, "config.json")
-        if not os.path.isfile(config_path):
-            continue
-        try:
-            with open(config_path) as f:
-                config = json.load(f)
-            team_name = os.path.basename(team_dir)
-            members = config.get("members", [])
-            if members:
-                member_names = [m.get("name", "unknown") for m in members]
-                lines.append(f"  Team '{team_name}': {', '.join(member_names)}")
-        except (json.JSONDecodeError, OSError):
-            continue
+    try:
+        with os.scandir(teams_root) as teams:
+            for team in teams:
+                if not team.is_dir(follow_symlinks=False):
+                    continue
+                config_path = os.path.join(team.path, "config.json")
+                try:
+                    with open(config_path) as f:
+                        config = json.load(f)
+                    members = config.get("members", [])
+                    if members:
+                        member_names = [m.get("name", "unknown") for m in members]
+                        lines.append(f"  Team '{team.name}': {', '.join(member_names)}")
+                except (json.JSONDecodeError, OSError):
+                    continue
+    except OSError:
+        pass
 
     return lines
 
@@ -0,0 +1,108 @@
+"""Shared mtime-validated cache of parsed task files under ~/.claude/tasks.
+
+Several hooks snapshot the same task tree on every invocation. Parses are
+memoized in tasks/.cache.json keyed by mtime_ns, so a steady-state call pays
+one scandir per team dir and zero JSON parses; only changed files are re-read,
+concurrently when there are enough of them to hide per-file I/O latency.
+"""
+
+import json
+import os
+
+TASKS_DIR = os.path.expanduser("~/.claude/tasks")
+CACHE_FILE = os.path.join(TASKS_DIR, ".cache.json")
+
+# Below this many cache misses a thread pool costs more than it saves
+PARALLEL_THRESHOLD = 4
+MAX_WORKERS = 8
+
+
+def _parse_one(path):
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+    except (json.JSONDecodeError, OSError):
+        return None
+
+
+def load_tasks(tasks_dir=TASKS_DIR):
+    """Return (team_name, file_name, data) for every parseable task file.
+
+    file_name keeps its .json suffix so callers can match the on-disk name.
+    The cache is rewritten atomically, and only when something changed.
+    """
+    try:
+        with open(CACHE_FILE, "rb") as f:
+            cache = json.loads(f.read())
+        if not isinstance(cache, dict):
+            cache = {}
+    except (json.JSONDecodeError, OSError):
+        cache = {}
+
+    # One scandir pass collecting (team, name, mtime, miss_path, cached_data);
+    # miss parses happen afterwards so they can run concurrently.
+    records = []
+    try:
+        teams = os.scandir(tasks_dir)
+    except OSError:
+        return []
+
+    with teams:
+        for team in teams:
+            if not team.is_dir(follow_symlinks=False):
+                continue
+            with os.scandir(team.path) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    try:
+                        mtime = entry.stat(follow_symlinks=False).st_mtime_ns
+                    except OSError:
+                        continue
+                    cached = cache.get(f"{team.name}/{entry.name}")
+                    if isinstance(cached, dict) and cached.get("mtime") == mtime:
+                        records.append((team.name, entry.name, mtime, None, cached["data"]))
+                    else:
+                        records.append((team.name, entry.name, mtime, entry.path, None))
+
+    # Re-parse cache misses; the GIL releases around the read syscalls, so a
+    # small pool overlaps their latency when many files changed at once.
+    miss_paths = [path for _, _, _, path, _ in records if path is not None]
+    if len(miss_paths) > PARALLEL_THRESHOLD:
+        from concurrent.futures import ThreadPoolExecutor  # deferred: miss path only
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+            parsed = iter(list(ex.map(_parse_one, miss_paths)))
+    else:
+        parsed = iter([_parse_one(p) for p in miss_paths])
+
+    tasks = []
+    fresh = {}
+    dirty = False
+    for team_name, name, mtime, path, data in records:
+        if path is not None:
+            data = next(parsed)
+            dirty = True
+        fresh[f"{team_name}/{name}"] = {"mtime": mtime, "data": data}
+        if data is None:
+            # Unparseable at this mtime — remembered as null so the file is
+            # not re-read (and the cache not rewritten) on every invocation
+            continue
+        tasks.append((team_name, name, data))
+
+    # Deleted files also invalidate the cache
+    if dirty or fresh.keys() != cache.keys():
+        tmp = f"{CACHE_FILE}.tmp.{os.getpid()}"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(fresh, f, separators=(",", ":"))
+            os.replace(tmp, CACHE_FILE)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    return tasks
@@ -106,10 +106,57 @@ ALLOW_PATTERNS = [
     r"^task\b",
 ]
 
+# Unions — one alternation per rule class instead of ~36 re.search calls per
+# hook invocation. Deny reasons are recovered from the named group that
+# matched. The worktree variant omits the Graphite-enforcement rules
+# (skip_in_worktree flag) so the per-entry skip logic is baked into which
+# union gets searched. Compilation is deferred until after the byte prefilter
+# in main(), so trivial commands never pay for it; a pickle cache was
+# considered and rejected — unpickling a Pattern recompiles it anyway.
+DENY_REASONS = {f"d{i}": entry[1] for i, entry in enumerate(DENY_PATTERNS)}
+
+
+def compile_rules():
+    """Compile the deny/pr-review/allow unions. Called once per invocation."""
+    deny_re = re.compile(
+        "|".join(f"(?P<d{i}>{entry[0]})" for i, entry in enumerate(DENY_PATTERNS))
+    )
+    deny_worktree_re = re.compile(
+        "|".join(
+            f"(?P<d{i}>{entry[0]})"
+            for i, entry in enumerate(DENY_PATTERNS)
+            if not (len(entry) > 2 and entry[2])
+        )
+    )
+    pr_review_re = re.compile("|".join(f"(?:{p})" for p in PR_REVIEW_PATTERNS))
+    allow_re = re.compile("|".join(f"(?:{p})" for p in ALLOW_PATTERNS))
+    return deny_re, deny_worktree_re, pr_review_re, allow_re
+
+
+# Prefilter: byte literals that must appear in the raw payload for ANY rule
+# above (deny, pr-review, or allow) to possibly match. Trivial commands like
+# `ls` exit before JSON parsing or regex work. A false positive only means
+# taking the normal path, but this MUST stay a superset of the rule tables —
+# a missing literal silently disables its rule.
+TRIGGER_BYTES = (
+    # Deny class
+    b"sudo", b"dd", b"git", b"rm", b"chmod", b"curl", b"wget",
+    b"tee", b"killall", b">", b":(",
+    # PR review class
+    b"sleep",
+    # Allow class
+    b"ruff", b"black", b"prettier", b"gofmt", b"pg_format", b"pytest",
+    b"npm", b"go ", b"gt", b"task",
+)
+
 
 def main():
+    buf = sys.stdin.buffer.read()
+    if not any(t in buf for t in TRIGGER_BYTES):
+        sys.exit(0)
+
     try:
-        data = json.load(sys.stdin)
+        data = json.loads(buf)
     except (json.JSONDecodeError, EOFError):
         sys.exit(0)
 
@@ -117,58 +164,59 @@ def main():
     if not command:
         sys.exit(0)
 
+    deny_full_re, deny_worktree_re, pr_review_re, allow_re = compile_rules()
+
     # Check deny patterns first
-    for entry in DENY_PATTERNS:
-        pattern, reason = entry[0], entry[1]
-        skip_in_worktree = entry[2] if len(entry) > 2 else False
-        if skip_in_worktree and (is_inside_worktree() or is_plain_git_context()):
-            continue
-        if re.search(pattern, command):
-            result = {
-                "hookSpecificOutput": {
-                    "hookEventName": "PreToolUse",
-                    "permissionDecision": "deny",
-                    "permissionDecisionReason": reason,
-                }
+    deny_re = (
+        deny_worktree_re
+        if is_inside_worktree() or is_plain_git_context()
+        else deny_full_re
+    )
+    m = deny_re.search(command)
+    if m:
+        result = {
+            "hookSpecificOutput": {
+                "hookEventName": "PreToolUse",
+                "permissionDecision": "deny",
+                "permissionDecisionReason": DENY_REASONS[m.lastgroup],
             }
-            json.dump(result, sys.stdout)
-            sys.exit(0)
+        }
+        json.dump(result, sys.stdout)
+        sys.exit(0)
 
     # Check PR review context patterns
     stripped = command.strip()
-    for pattern in PR_REVIEW_PATTERNS:
-        if re.search(pattern, stripped):
-            if os.path.isfile(SENTINEL):
-                result = {
-                    "hookSpecificOutput": {
-                        "hookEventName": "PreToolUse",
-                        "permissionDecision": "allow",
-                        "permissionDecisionReason": "auto-approved: pr review context active",
-                    }
-                }
-            else:
-                result = {
-                    "hookSpecificOutput": {
-                        "hookEventName": "PreToolUse",
-                        "permissionDecision": "deny",
-                        "permissionDecisionReason": "requires active pr review context (~/.claude/.pr-review-active)",
-                    }
-                }
-            json.dump(result, sys.stdout)
-            sys.exit(0)
-
-    # Check allow patterns
-    for pattern in ALLOW_PATTERNS:
-        if re.search(pattern, stripped):
+    if pr_review_re.search(stripped):
+        if os.path.isfile(SENTINEL):
             result = {
                 "hookSpecificOutput": {
                     "hookEventName": "PreToolUse",
                     "permissionDecision": "allow",
-                    "permissionDecisionReason": "auto-approved safe command",
+                    "permissionDecisionReason": "auto-approved: pr review context active",
+                }
+            }
+        else:
+            result = {
+                "hookSpecificOutput": {
+                    "hookEventName": "PreToolUse",
+                    "permissionDecision": "deny",
+                    "permissionDecisionReason": "requires active pr review context (~/.claude/.pr-review-active)",
                 }
             }
-            json.dump(result, sys.stdout)
-            sys.exit(0)
+        json.dump(result, sys.stdout)
+        sys.exit(0)
+
+    # Check allow patterns
+    if allow_re.search(stripped):
+        result = {
+            "hookSpecificOutput": {
+                "hookEventName": "PreToolUse",
+                "permissionDecision": "allow",
+                "permissionDecisionReason": "auto-approved safe command",
+            }
+        }
+        json.dump(result, sys.stdout)
+        sys.exit(0)
 
     # Fall through to normal permission handling
     sys.exit(0)